@@ -0,0 +1,213 @@
+import argparse
+import importlib
+import random
+from multiprocessing import Pool
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple
+
+from irrf import IRRF, CalculateTax
+
+
+BRACKET_LIMITS = (
+    CalculateTax.TAX_EXEMPT_VALUE,
+    CalculateTax.FIRST_TAX_STEP,
+    CalculateTax.SECOND_TAX_STEP,
+    CalculateTax.THIRD_TAX_STEP,
+)
+
+# Deduction profiles (official pension, dependents, food pension, other
+# deductions) used to reach each bracket limit through different sums.
+BOUNDARY_DEDUCTION_PROFILES = (
+    (0.0, 0, 0.0, 0.0),
+    (0.0, 1, 0.0, 0.0),
+    (0.0, 3, 0.0, 0.0),
+    (400.0, 0, 0.0, 0.0),
+    (250.35, 2, 150.0, 80.1),
+)
+
+
+class Taxpayer(NamedTuple):
+    income: float
+    official_pension: float = 0.0
+    dependents: int = 0
+    food_pension: float = 0.0
+    other_deductions: float = 0.0
+
+
+class Mismatch(NamedTuple):
+    taxpayer: Taxpayer
+    expected: float
+    got: object
+
+
+class DifferentialReport:
+    def __init__(self) -> None:
+        self.checked = 0
+        self.mismatch_count = 0
+        self.mismatches: List[Mismatch] = []
+
+    @property
+    def ok(self) -> bool:
+        return self.mismatch_count == 0
+
+    def merge(self, checked: int, mismatch_count: int, mismatches: List[Mismatch], max_reported: int) -> None:
+        self.checked += checked
+        self.mismatch_count += mismatch_count
+        self.mismatches.extend(mismatches[:max_reported - len(self.mismatches)])
+
+    def __str__(self) -> str:
+        lines = [f'checked={self.checked} mismatches={self.mismatch_count}']
+        for mismatch in self.mismatches:
+            t = mismatch.taxpayer
+            lines.append(
+                f'  income={t.income!r} pension={t.official_pension!r} dependents={t.dependents} '
+                f'food={t.food_pension!r} other={t.other_deductions!r} '
+                f'expected={mismatch.expected!r} got={mismatch.got!r}'
+            )
+        return '\n'.join(lines)
+
+
+def build_irrf(taxpayer: Taxpayer) -> IRRF:
+    irrf = IRRF()
+    irrf.register_income(taxpayer.income, 'Rendimento')
+    if taxpayer.official_pension:
+        irrf.register_official_pension(('Previdencia oficial', taxpayer.official_pension))
+    for index in range(taxpayer.dependents):
+        irrf.register_dependent(f'Dependente {index}')
+    if taxpayer.food_pension:
+        irrf.register_food_pension(taxpayer.food_pension)
+    if taxpayer.other_deductions:
+        irrf.register_other_deductions(('Outras deducoes', taxpayer.other_deductions))
+    return irrf
+
+
+def reference_tax(taxpayer: Taxpayer) -> float:
+    return CalculateTax(build_irrf(taxpayer)).compute()
+
+
+def boundary_taxpayers(spread: int = 500) -> List[Taxpayer]:
+    """
+    Taxpayers whose calculation basis walks centavo by centavo from
+    `spread` cents below to `spread` cents above every bracket limit.
+    """
+    taxpayers = []
+    for limit in BRACKET_LIMITS:
+        for cents in range(-spread, spread + 1):
+            basis = round(limit + cents / 100, 2)
+            for pension, dependents, food, other in BOUNDARY_DEDUCTION_PROFILES:
+                deductions = pension + dependents * IRRF.DEPENDENT_DEDUCTION + food + other
+                taxpayers.append(Taxpayer(
+                    income=round(basis + deductions, 2),
+                    official_pension=pension,
+                    dependents=dependents,
+                    food_pension=food,
+                    other_deductions=other,
+                ))
+    return taxpayers
+
+
+def random_taxpayers(seed: int, count: int) -> Iterator[Taxpayer]:
+    rng = random.Random(seed)
+    for _ in range(count):
+        has_deductions = rng.random() < 0.7
+        yield Taxpayer(
+            income=rng.randint(1, 5_000_000) / 100,
+            official_pension=rng.randint(0, 100_000) / 100 if has_deductions else 0.0,
+            dependents=rng.randint(0, 5) if has_deductions else 0,
+            food_pension=rng.randint(0, 150_000) / 100 if has_deductions and rng.random() < 0.3 else 0.0,
+            other_deductions=rng.randint(0, 80_000) / 100 if has_deductions and rng.random() < 0.3 else 0.0,
+        )
+
+
+def _check(candidate: Callable[[Taxpayer], float], taxpayers, max_reported: int) -> Tuple[int, int, List[Mismatch]]:
+    checked = 0
+    mismatch_count = 0
+    mismatches = []
+    for taxpayer in taxpayers:
+        checked += 1
+        expected = reference_tax(taxpayer)
+        try:
+            got = candidate(taxpayer)
+        except Exception as error:
+            got = error
+        if got != expected:
+            mismatch_count += 1
+            if len(mismatches) < max_reported:
+                mismatches.append(Mismatch(taxpayer, expected, got))
+    return checked, mismatch_count, mismatches
+
+
+def _run_chunk(task) -> Tuple[int, int, List[Mismatch]]:
+    candidate, kind, first, second, max_reported = task
+    if kind == 'boundary':
+        taxpayers = boundary_taxpayers(spread=first)[second[0]:second[1]]
+    else:
+        taxpayers = random_taxpayers(seed=first, count=second)
+    return _check(candidate, taxpayers, max_reported)
+
+
+def run_differential(
+    candidate: Callable[[Taxpayer], float],
+    random_cases: int = 1_000_000,
+    boundary_spread: int = 500,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    chunk_size: int = 50_000,
+    max_reported: int = 20,
+) -> DifferentialReport:
+    """
+    Compares `candidate` against the scalar `CalculateTax.compute` path on
+    every boundary taxpayer plus `random_cases` randomized ones. The
+    candidate must be a module level function so it can be sent to the
+    worker processes; `workers=1` runs everything in this process.
+    """
+    boundary_count = len(boundary_taxpayers(spread=boundary_spread))
+    tasks = [
+        (candidate, 'boundary', boundary_spread, (start, min(start + chunk_size, boundary_count)), max_reported)
+        for start in range(0, boundary_count, chunk_size)
+    ]
+    tasks.extend(
+        (candidate, 'random', seed + index, min(chunk_size, random_cases - start), max_reported)
+        for index, start in enumerate(range(0, random_cases, chunk_size))
+    )
+
+    report = DifferentialReport()
+    if workers == 1:
+        for result in map(_run_chunk, tasks):
+            report.merge(*result, max_reported=max_reported)
+        return report
+
+    with Pool(processes=workers) as pool:
+        for result in pool.imap_unordered(_run_chunk, tasks):
+            report.merge(*result, max_reported=max_reported)
+    return report
+
+
+def load_candidate(path: str) -> Callable[[Taxpayer], float]:
+    module_name, _, function_name = path.partition(':')
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Differential test of an IRRF tax implementation against CalculateTax.')
+    parser.add_argument('candidate', help='candidate function as module:function, receiving a Taxpayer')
+    parser.add_argument('--cases', type=int, default=1_000_000, help='number of randomized taxpayers')
+    parser.add_argument('--spread', type=int, default=500, help='centavos checked around each bracket limit')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=50_000)
+    args = parser.parse_args(argv)
+
+    report = run_differential(
+        load_candidate(args.candidate),
+        random_cases=args.cases,
+        boundary_spread=args.spread,
+        seed=args.seed,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+    )
+    print(report)
+    return 0 if report.ok else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
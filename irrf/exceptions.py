@@ -18,4 +18,19 @@ class ValorDeducaoInvalidoException(Exception):
 class NomeEmBrancoException(Exception):
     """
     Exception raised when a dependent name is empty
-    """
\ No newline at end of file
+    """
+
+class DeducaoDuplicadaException(Exception):
+    """
+    Exception raised when a duplicated deduction is registered
+    """
+
+class ArquivoResultadosInvalidoException(Exception):
+    """
+    Exception raised when a results file is corrupted or has an unsupported version
+    """
+
+class EstornoInvalidoException(Exception):
+    """
+    Exception raised when a ledger event cannot be reversed
+    """
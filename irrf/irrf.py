@@ -1,5 +1,6 @@
 import numbers
-from typing import Dict, List, Tuple
+from decimal import Decimal
+from typing import Dict, List, Sequence, Tuple
 
 from exceptions import (
     DescricaoEmBrancoException,
@@ -7,6 +8,7 @@ from exceptions import (
     NomeEmBrancoException,
     ValorDeducaoInvalidoException,
 )
+from registry import DeductionRegistry
 
 from functools import total_ordering
 
@@ -51,6 +53,7 @@ class Deduction:
         self.type = type
         self.description = description
         self.value = value
+        self.name = name
 
     def __eq__(self, other):
         return self.value == other.value and self.description == other.description
@@ -80,26 +83,102 @@ class BaseRange:
         return round(self.min, 2) < round(other.min, 2)
 
 
-class IRRF:
+def to_decimal(value: float) -> Decimal:
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+class DeclaredTotals:
+    """
+    Income and deduction totals of a declaration. Values are summed as
+    Decimals of their shortest representation, so 1023.54 counts as
+    exactly 1023.54, the registration order does not change the totals and
+    removing a value gives back the total without it. The accessors return
+    floats.
+    """
+    INCOME = 0
+    OFFICIAL_PENSION = 1
+    DEPENDENTS = 2
+    FOOD_PENSION = 3
+    OTHER_DEDUCTIONS = 4
+
+    def __init__(self, totals: Sequence[Decimal] = (Decimal(0),) * 5) -> None:
+        self._set_totals(totals)
+
+    def _set_totals(self, totals: Sequence[Decimal]) -> None:
+        self._exact_totals = list(totals)
+        self._totals = [float(total) for total in self._exact_totals]
+        self._refresh_basis()
+
+    def _add_to_total(self, index: int, value: float) -> None:
+        self._exact_totals[index] += to_decimal(value)
+        self._totals[index] = float(self._exact_totals[index])
+        self._refresh_basis()
+
+    def _refresh_basis(self) -> None:
+        exact = self._exact_totals
+        deductions = (
+            exact[DeclaredTotals.OFFICIAL_PENSION] +
+            exact[DeclaredTotals.DEPENDENTS] +
+            exact[DeclaredTotals.FOOD_PENSION] +
+            exact[DeclaredTotals.OTHER_DEDUCTIONS]
+        )
+        self._all_deductions = float(deductions)
+        self._calculation_basis = float(exact[DeclaredTotals.INCOME] - deductions)
+
+    @property
+    def total_income(self) -> float:
+        return self._totals[DeclaredTotals.INCOME]
+
+    def get_total_official_pension(self) -> float:
+        return self._totals[DeclaredTotals.OFFICIAL_PENSION]
+
+    def get_total_dependent_deductions(self) -> float:
+        return self._totals[DeclaredTotals.DEPENDENTS]
+
+    def get_total_food_pension(self) -> float:
+        return self._totals[DeclaredTotals.FOOD_PENSION]
+
+    def get_other_deductions(self) -> float:
+        return self._totals[DeclaredTotals.OTHER_DEDUCTIONS]
+
+    @property
+    def all_deductions(self) -> float:
+        return self._all_deductions
+
+    @property
+    def calculation_basis(self) -> float:
+        return self._calculation_basis
+
+    def get_tax(self):
+        if kernel is not None:
+            return kernel.tax(self.calculation_basis)
+        return CalculateTax(self).compute()
+
+    @property
+    def effective_rate(self) -> float:
+        if kernel is not None:
+            return kernel.effective_rate(self.total_income, self.calculation_basis)
+
+        tax = self.get_tax()
+        effective_rate = (tax / self.total_income) * 100
+        return round(effective_rate, 2)
+
+
+class IRRF(DeclaredTotals):
     DEPENDENT_DEDUCTION = 189.59
 
-    def __init__(self) -> None:
+    def __init__(self, duplicate_policy: str = DeductionRegistry.KEEP_ALL) -> None:
+        super().__init__()
         self._declared_incomes: List[Income] = []
         self._calculation_base_ranges: Dict[int, List[BaseRange]] = {}
         self._declared_deductions: List[Deduction] = []
-
-        self.total_income: float = 0
-        self._official_pension_total_value = 0.0
-        self._dependent_deductions = 0.0
-        self._food_pension = 0.0
-        self._other_deductions_value = 0.0
+        self._deduction_registry = DeductionRegistry(duplicate_policy)
 
     def register_income(self, value: float, description: str) -> None:
-        self.total_income += value
+        income = Income(value=value, description=description)
 
-        self._declared_incomes.append(
-            Income(value=value, description=description),
-        )
+        self._declared_incomes.append(income)
+        self._add_to_total(DeclaredTotals.INCOME, value)
 
     def register_deduction(self, deduction: Tuple[str, Tuple]) -> None:
         method = self.select_deduction_method(deduction[0])
@@ -122,8 +201,16 @@ class IRRF:
     def declared_incomes(self, value: List[Income]) -> None:
         raise RuntimeError("It is not allowed to change the list of declared income")
 
-    def get_tax(self):
-        return CalculateTax(self).compute()
+    @property
+    def deduction_registry(self) -> DeductionRegistry:
+        return self._deduction_registry
+
+    def _declare_deduction(self, deduction: Deduction) -> bool:
+        if not self._deduction_registry.add(deduction):
+            return False
+
+        self._declared_deductions.append(deduction)
+        return True
 
     def register_calculation_base_range(self, year: int, table: List[BaseRange]) -> None:
         self._calculation_base_ranges[year] = table
@@ -134,11 +221,8 @@ class IRRF:
     def register_official_pension(self, deduction_tuple: Tuple[str, float]) -> None:
         description = deduction_tuple[0]
         value = deduction_tuple[1]
-        self._declared_deductions.append(Deduction(type="Previdencia oficial", description=description, value=value))
-        self._official_pension_total_value += value
-
-    def get_total_official_pension(self) -> float:
-        return self._official_pension_total_value
+        if self._declare_deduction(Deduction(type="Previdencia oficial", description=description, value=value)):
+            self._add_to_total(DeclaredTotals.OFFICIAL_PENSION, value)
 
     def loop_over_dependents(self, names) -> None:
         for name in names:
@@ -151,11 +235,8 @@ class IRRF:
             value=IRRF.DEPENDENT_DEDUCTION,
             name=name,
         )
-        self._declared_deductions.append(deduction)
-        self._dependent_deductions += IRRF.DEPENDENT_DEDUCTION
-
-    def get_total_dependent_deductions(self) -> float:
-        return self._dependent_deductions
+        if self._declare_deduction(deduction):
+            self._add_to_total(DeclaredTotals.DEPENDENTS, IRRF.DEPENDENT_DEDUCTION)
 
     def loop_over_food_pensions(self, values) -> None:
         for value in values:
@@ -167,11 +248,8 @@ class IRRF:
             description="Pensao alimenticia",
             value=value
         )
-        self._declared_deductions.append(deduction)
-        self._food_pension += deduction.value
-
-    def get_total_food_pension(self) -> float:
-        return self._food_pension
+        if self._declare_deduction(deduction):
+            self._add_to_total(DeclaredTotals.FOOD_PENSION, deduction.value)
 
     def register_other_deductions(self, deduction_tuple: Tuple[str, float]) -> None:
         deduction = Deduction(
@@ -179,30 +257,8 @@ class IRRF:
             description=deduction_tuple[0],
             value=deduction_tuple[1]
         )
-        self._declared_deductions.append(deduction)
-        self._other_deductions_value += deduction.value
-
-    def get_other_deductions(self) -> float:
-        return self._other_deductions_value
-
-    @property
-    def all_deductions(self) -> float:
-        return (
-            self._official_pension_total_value +
-            self._dependent_deductions +
-            self._food_pension +
-            self._other_deductions_value
-        )
-
-    @property
-    def calculation_basis(self):
-        return self.total_income - self.all_deductions
-
-    @property
-    def effective_rate(self) -> float:
-        tax = self.get_tax()
-        effective_rate = (tax / self.total_income) * 100
-        return round(effective_rate, 2)
+        if self._declare_deduction(deduction):
+            self._add_to_total(DeclaredTotals.OTHER_DEDUCTIONS, deduction.value)
 
 
 class CalculateTax:
@@ -259,3 +315,11 @@ class CalculateTax:
             self.tax = self.calculate_tax_with_the_fourth_range()
 
         return round(self.tax, 2)
+
+
+# The kernel generated for the CalculateTax table is selected when it can be
+# built, otherwise get_tax and effective_rate fall back to CalculateTax
+try:
+    import kernel
+except (ImportError, SyntaxError, ValueError):
+    kernel = None
@@ -0,0 +1,115 @@
+"""
+Tax kernels generated for one table, with the limits, aliquots and
+deductions inlined as literals. The module level functions use the
+`CalculateTax` table and back `IRRF.get_tax` and `IRRF.effective_rate`;
+`CalculateTax.compute` stays the reference implementation and the fallback
+when this module cannot be built.
+"""
+from typing import Callable, List, NamedTuple, Sequence
+
+from irrf import BaseRange, CalculateTax
+
+
+class TaxKernel(NamedTuple):
+    bracket: Callable[[float], int]
+    tax: Callable[[float], float]
+    effective_rate: Callable[[float, float], float]
+    brackets: Callable[[Sequence[float]], List[int]]
+    taxes: Callable[[Sequence[float]], List[float]]
+    effective_rates: Callable[[Sequence[float], Sequence[float]], List[float]]
+
+
+def compile_kernel(limits: Sequence[float], aliquots: Sequence[float], exempt_values: Sequence[float]) -> TaxKernel:
+    """
+    Generates a kernel specialized for one tax table, with every limit,
+    aliquot and deduction inlined as a literal. Bases below `limits[0]` are
+    exempt and `limits[i] <= basis < limits[i + 1]` pays
+    `basis * aliquots[i] - exempt_values[i]`, rounded like
+    `CalculateTax.compute`.
+    """
+    if not limits:
+        raise ValueError('The tax table needs at least one tax step')
+    if not len(limits) == len(aliquots) == len(exempt_values):
+        raise ValueError('Every tax step needs one limit, one aliquot and one exempt value')
+
+    bracket_lines = [f'    if basis < {limits[0]!r}: return 0']
+    tax_lines = [f'    if basis < {limits[0]!r}: return 0']
+    for index in range(1, len(limits)):
+        bracket_lines.append(f'    if basis < {limits[index]!r}: return {index}')
+        tax_lines.append(
+            f'    if basis < {limits[index]!r}: '
+            f'return round(basis * {aliquots[index - 1]!r} - {exempt_values[index - 1]!r}, 2)'
+        )
+    bracket_lines.append(f'    return {len(limits)}')
+    tax_lines.append(f'    return round(basis * {aliquots[-1]!r} - {exempt_values[-1]!r}, 2)')
+
+    source = '\n'.join([
+        'def bracket(basis):',
+        *bracket_lines,
+        'def tax(basis):',
+        *tax_lines,
+        'def effective_rate(total_income, basis):',
+        '    return round((tax(basis) / total_income) * 100, 2)',
+        'def brackets(bases, bracket=bracket):',
+        '    return [bracket(basis) for basis in bases]',
+        'def taxes(bases, tax=tax):',
+        '    return [tax(basis) for basis in bases]',
+        'def effective_rates(total_incomes, bases, tax=tax):',
+        '    return [round((tax(basis) / total_income) * 100, 2) for total_income, basis in zip(total_incomes, bases)]',
+    ])
+    namespace = {}
+    exec(compile(source, '<irrf tax kernel>', 'exec'), namespace)
+    return TaxKernel(**{field: namespace[field] for field in TaxKernel._fields})
+
+
+def compile_kernel_from_base_range(table: List[BaseRange]) -> TaxKernel:
+    """
+    Builds the kernel of a table registered with
+    `IRRF.register_calculation_base_range`. The deduction of each range is
+    derived so the tax is continuous at the range minimum.
+    """
+    taxed_ranges = [base_range for base_range in sorted(table) if base_range.tax]
+
+    exempt_values = []
+    previous_exempt = 0.0
+    previous_aliquot = 0.0
+    for base_range in taxed_ranges:
+        aliquot = base_range.tax / 100
+        previous_exempt = round(previous_exempt + base_range.min * (aliquot - previous_aliquot), 2)
+        previous_aliquot = aliquot
+        exempt_values.append(previous_exempt)
+
+    return compile_kernel(
+        limits=[base_range.min for base_range in taxed_ranges],
+        aliquots=[base_range.tax / 100 for base_range in taxed_ranges],
+        exempt_values=exempt_values,
+    )
+
+
+KERNEL = compile_kernel(
+    limits=(
+        CalculateTax.TAX_EXEMPT_VALUE,
+        CalculateTax.FIRST_TAX_STEP,
+        CalculateTax.SECOND_TAX_STEP,
+        CalculateTax.THIRD_TAX_STEP,
+    ),
+    aliquots=(
+        CalculateTax.FIRST_ALIQUOT,
+        CalculateTax.SECOND_ALIQUOT,
+        CalculateTax.THIRD_ALIQUOT,
+        CalculateTax.FOURTH_ALIQUOT,
+    ),
+    exempt_values=(
+        CalculateTax.EXEMPT_VALUE,
+        CalculateTax.FIRST_RANGE_EXEMPT_VALUE,
+        CalculateTax.SECOND_RANGE_EXEMPT_VALUE,
+        CalculateTax.THIRD_RANGE_EXEMPT_VALUE,
+    ),
+)
+
+bracket = KERNEL.bracket
+tax = KERNEL.tax
+effective_rate = KERNEL.effective_rate
+brackets = KERNEL.brackets
+taxes = KERNEL.taxes
+effective_rates = KERNEL.effective_rates
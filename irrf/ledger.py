@@ -0,0 +1,142 @@
+from decimal import Decimal
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from exceptions import EstornoInvalidoException
+from irrf import IRRF, DeclaredTotals, Deduction, Income, to_decimal
+from registry import DeductionRegistry
+
+
+INCOME = 'Rendimento'
+OFFICIAL_PENSION = 'Previdencia oficial'
+DEPENDENT = 'Dependente'
+FOOD_PENSION = 'Pensão alimenticia'
+OTHER_DEDUCTIONS = 'Outras deducoes'
+
+# Position of each event kind in the running totals
+TOTAL_INDEX = {
+    INCOME: DeclaredTotals.INCOME,
+    OFFICIAL_PENSION: DeclaredTotals.OFFICIAL_PENSION,
+    DEPENDENT: DeclaredTotals.DEPENDENTS,
+    FOOD_PENSION: DeclaredTotals.FOOD_PENSION,
+    OTHER_DEDUCTIONS: DeclaredTotals.OTHER_DEDUCTIONS,
+}
+
+
+class Event(NamedTuple):
+    sequence: int
+    kind: str
+    description: str
+    value: float
+    reverses: Optional[int] = None
+
+
+class LedgerState(DeclaredTotals):
+    """
+    Totals of a ledger at some point of its history. They are summed like
+    the `IRRF` totals, so the basis and the tax match an `IRRF` rebuilt from
+    the registrations that were not reversed.
+    """
+
+
+class IRRFLedger:
+    """
+    Append-only log of IRRF registrations. Every registration returns the
+    sequence number of its event, which `reverse` cancels in constant time
+    by appending a compensating event and subtracting its value from the
+    exact running totals. The totals at every `snapshot_interval` events
+    are kept as snapshots, so `state_at` replays at most that many events.
+    Deductions go through a `DeductionRegistry` with `duplicate_policy`,
+    like `IRRF`; registrations it discards are not logged and return None.
+    """
+
+    def __init__(self, snapshot_interval: int = 256, duplicate_policy: str = DeductionRegistry.KEEP_ALL) -> None:
+        if snapshot_interval <= 0:
+            raise ValueError(f'The snapshot interval must be positive, got {snapshot_interval}')
+
+        self.snapshot_interval = snapshot_interval
+        self._events: List[Event] = []
+        self._reversed: Set[int] = set()
+        self._deduction_registry = DeductionRegistry(duplicate_policy)
+        self._deductions: Dict[int, Deduction] = {}
+        self._totals: List[Decimal] = [Decimal(0)] * len(TOTAL_INDEX)
+        self._snapshots: List[Tuple[Decimal, ...]] = [tuple(self._totals)]
+
+    def _append(self, kind: str, description: str, value: float, reverses: Optional[int] = None) -> int:
+        sequence = len(self._events)
+        self._events.append(Event(sequence, kind, description, value, reverses))
+        self._totals[TOTAL_INDEX[kind]] += to_decimal(value)
+
+        if len(self._events) % self.snapshot_interval == 0:
+            self._snapshots.append(tuple(self._totals))
+        return sequence
+
+    def _append_deduction(self, deduction: Deduction, description: str) -> Optional[int]:
+        if not self._deduction_registry.add(deduction):
+            return None
+
+        sequence = self._append(deduction.type, description, deduction.value)
+        self._deductions[sequence] = deduction
+        return sequence
+
+    @property
+    def deduction_registry(self) -> DeductionRegistry:
+        return self._deduction_registry
+
+    def register_income(self, value: float, description: str) -> int:
+        income = Income(value=value, description=description)
+        return self._append(INCOME, income.description, income.value)
+
+    def register_official_pension(self, deduction_tuple: Tuple[str, float]) -> Optional[int]:
+        deduction = Deduction(type=OFFICIAL_PENSION, description=deduction_tuple[0], value=deduction_tuple[1])
+        return self._append_deduction(deduction, deduction.description)
+
+    def register_dependent(self, name: str) -> Optional[int]:
+        deduction = Deduction(type=DEPENDENT, description=DEPENDENT, value=IRRF.DEPENDENT_DEDUCTION, name=name)
+        return self._append_deduction(deduction, name)
+
+    def register_food_pension(self, value: float) -> Optional[int]:
+        deduction = Deduction(type=FOOD_PENSION, description='Pensao alimenticia', value=value)
+        return self._append_deduction(deduction, deduction.description)
+
+    def register_other_deductions(self, deduction_tuple: Tuple[str, float]) -> Optional[int]:
+        deduction = Deduction(type=OTHER_DEDUCTIONS, description=deduction_tuple[0], value=deduction_tuple[1])
+        return self._append_deduction(deduction, deduction.description)
+
+    def reverse(self, sequence: int) -> int:
+        if not 0 <= sequence < len(self._events):
+            raise EstornoInvalidoException(f'There is no event {sequence} in the ledger')
+
+        event = self._events[sequence]
+        if event.reverses is not None:
+            raise EstornoInvalidoException(f'The event {sequence} is already a reversal')
+        if sequence in self._reversed:
+            raise EstornoInvalidoException(f'The event {sequence} was already reversed')
+
+        self._reversed.add(sequence)
+        if sequence in self._deductions:
+            self._deduction_registry.discard(self._deductions.pop(sequence))
+        return self._append(event.kind, event.description, -event.value, reverses=sequence)
+
+    @property
+    def events(self) -> Tuple[Event, ...]:
+        return tuple(self._events)
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    @property
+    def state(self) -> LedgerState:
+        return LedgerState(self._totals)
+
+    def state_at(self, sequence: int) -> LedgerState:
+        """
+        State after the first `sequence` events of the log.
+        """
+        if not 0 <= sequence <= len(self._events):
+            raise IndexError(f'The ledger has {len(self._events)} events, got {sequence}')
+
+        snapshot = sequence // self.snapshot_interval
+        totals = list(self._snapshots[snapshot])
+        for event in self._events[snapshot * self.snapshot_interval:sequence]:
+            totals[TOTAL_INDEX[event.kind]] += to_decimal(event.value)
+        return LedgerState(totals)
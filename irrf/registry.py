@@ -0,0 +1,75 @@
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+from exceptions import DeducaoDuplicadaException
+
+
+class DeductionRegistry:
+    """
+    Hashed index of the deductions declared to an IRRF. Dependents are
+    keyed by name and every other deduction by (type, description, value),
+    so checking or merging an entry costs constant time.
+    """
+    KEEP_ALL = 'keep_all'
+    KEEP_FIRST = 'keep_first'
+    RAISE = 'raise'
+
+    POLICIES = (KEEP_ALL, KEEP_FIRST, RAISE)
+
+    def __init__(self, policy: str = KEEP_ALL) -> None:
+        if policy not in DeductionRegistry.POLICIES:
+            raise ValueError(f'Unknown duplicate policy {policy!r}')
+
+        self.policy = policy
+        self._counts: Dict[Hashable, int] = {}
+
+    @staticmethod
+    def key(deduction) -> Tuple:
+        if deduction.type == 'Dependente':
+            return ('Dependente', deduction.name)
+        return (deduction.type, deduction.description, deduction.value)
+
+    def __contains__(self, deduction) -> bool:
+        return DeductionRegistry.key(deduction) in self._counts
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def count(self, deduction) -> int:
+        return self._counts.get(DeductionRegistry.key(deduction), 0)
+
+    def add(self, deduction) -> bool:
+        """
+        Records `deduction` following the registry policy and returns
+        whether it must be added to the totals.
+        """
+        key = DeductionRegistry.key(deduction)
+        count = self._counts.get(key, 0)
+
+        if count:
+            if self.policy == DeductionRegistry.RAISE:
+                raise DeducaoDuplicadaException(f'The deduction {key} was already registered')
+            if self.policy == DeductionRegistry.KEEP_FIRST:
+                return False
+
+        self._counts[key] = count + 1
+        return True
+
+    def discard(self, deduction) -> None:
+        """
+        Forgets one registration of `deduction`, so it can be registered
+        again after being reversed.
+        """
+        key = DeductionRegistry.key(deduction)
+        count = self._counts.get(key, 0)
+        if count > 1:
+            self._counts[key] = count - 1
+        elif count:
+            del self._counts[key]
+
+    def duplicates(self) -> List[Tuple]:
+        return [key for key, count in self._counts.items() if count > 1]
+
+
+def deduplicate(deductions: Iterable, policy: str = DeductionRegistry.KEEP_FIRST) -> List:
+    registry = DeductionRegistry(policy)
+    return [deduction for deduction in deductions if registry.add(deduction)]
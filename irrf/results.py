@@ -0,0 +1,281 @@
+import json
+import struct
+import sys
+from array import array
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from exceptions import ArquivoResultadosInvalidoException
+from irrf import IRRF
+import kernel
+
+
+MAGIC = b'IRRFCOL'
+VERSION = 1
+
+HEADER = struct.Struct('<7sH')
+TRAILER = struct.Struct('<I7s')
+
+COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ('taxpayer_id', 'q'),
+    ('year', 'q'),
+    ('total_income', 'd'),
+    ('official_pension', 'd'),
+    ('dependent_deductions', 'd'),
+    ('food_pension', 'd'),
+    ('other_deductions', 'd'),
+    ('calculation_basis', 'd'),
+    ('tax', 'd'),
+    ('effective_rate', 'd'),
+    ('bracket', 'q'),
+)
+
+ROW = struct.Struct('<' + ''.join(typecode for _, typecode in COLUMNS))
+
+
+class ResultRow(NamedTuple):
+    """
+    One IRRF result. `taxpayer_id`, `year` and `bracket` are stored as
+    int64, every other field as a double.
+    """
+    taxpayer_id: int
+    year: int
+    total_income: float
+    official_pension: float
+    dependent_deductions: float
+    food_pension: float
+    other_deductions: float
+    calculation_basis: float
+    tax: float
+    effective_rate: float
+    bracket: int
+
+    @classmethod
+    def from_irrf(cls, taxpayer_id: int, year: int, irrf: IRRF) -> 'ResultRow':
+        basis = irrf.calculation_basis
+        return cls(
+            taxpayer_id=taxpayer_id,
+            year=year,
+            total_income=irrf.total_income,
+            official_pension=irrf.get_total_official_pension(),
+            dependent_deductions=irrf.get_total_dependent_deductions(),
+            food_pension=irrf.get_total_food_pension(),
+            other_deductions=irrf.get_other_deductions(),
+            calculation_basis=basis,
+            tax=irrf.get_tax(),
+            effective_rate=irrf.effective_rate,
+            bracket=kernel.bracket(basis),
+        )
+
+
+def _to_little_endian(values: array) -> array:
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+
+class ResultsWriter:
+    """
+    Writes IRRF results in a columnar file. Rows are grouped in blocks of
+    `block_size`, each column of a block is stored contiguously and the
+    footer keeps the offset and the min/max of every column per block.
+    Each row is checked against the column types when written. If the
+    `with` body raises, the file is closed without a footer, so readers
+    reject it instead of taking partial data as complete.
+    """
+
+    def __init__(self, path: str, block_size: int = 65536) -> None:
+        if block_size <= 0:
+            raise ValueError(f'The block size must be positive, got {block_size}')
+
+        self.block_size = block_size
+        self._file: BinaryIO = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION))
+        self._blocks: List[Dict] = []
+        self._pending: List[ResultRow] = []
+
+    def __enter__(self) -> 'ResultsWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is not None:
+            self._file.close()
+            return
+        self.close()
+
+    def write(self, row: ResultRow) -> None:
+        try:
+            ROW.pack(*row)
+        except struct.error as error:
+            raise ValueError(f'The row does not fit the results columns: {error}') from error
+
+        self._pending.append(row)
+        if len(self._pending) >= self.block_size:
+            self._flush_block()
+
+    def write_irrf(self, taxpayer_id: int, year: int, irrf: IRRF) -> None:
+        self.write(ResultRow.from_irrf(taxpayer_id, year, irrf))
+
+    def _flush_block(self) -> None:
+        if not self._pending:
+            return
+
+        columns = {}
+        stats = {}
+        for index, (name, typecode) in enumerate(COLUMNS):
+            values = array(typecode, (row[index] for row in self._pending))
+            columns[name] = [self._file.tell(), len(values) * values.itemsize]
+            stats[name] = [min(values), max(values)]
+            _to_little_endian(values).tofile(self._file)
+
+        self._blocks.append({'rows': len(self._pending), 'columns': columns, 'stats': stats})
+        self._pending = []
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+
+        try:
+            self._flush_block()
+            footer = json.dumps({
+                'version': VERSION,
+                'columns': COLUMNS,
+                'blocks': self._blocks,
+            }).encode('utf-8')
+            self._file.write(footer)
+            self._file.write(TRAILER.pack(len(footer), MAGIC))
+        finally:
+            self._file.close()
+
+
+class ResultsReader:
+    """
+    Reads a file written by `ResultsWriter`. Filters on year, bracket and
+    effective rate are checked against the block statistics first, so
+    blocks that cannot match are never read.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._file: BinaryIO = open(path, 'rb')
+        self.blocks_read = 0
+        self.blocks_skipped = 0
+
+        try:
+            self._read_footer(path)
+        except ArquivoResultadosInvalidoException:
+            self.close()
+            raise
+        except (ValueError, KeyError, TypeError, UnicodeDecodeError) as error:
+            self.close()
+            raise ArquivoResultadosInvalidoException(f'{path} has a corrupted footer') from error
+
+    def _read_footer(self, path: str) -> None:
+        size = self._file.seek(0, 2)
+
+        header = self._read_at(0, HEADER.size)
+        if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+            raise ArquivoResultadosInvalidoException(f'{path} is not an IRRF results file')
+
+        _, version = HEADER.unpack(header)
+        if not 1 <= version <= VERSION:
+            raise ArquivoResultadosInvalidoException(
+                f'{path} has version {version}, only 1 to {VERSION} are supported'
+            )
+        self.version = version
+
+        if size < HEADER.size + TRAILER.size:
+            raise ArquivoResultadosInvalidoException(f'{path} is truncated')
+
+        footer_size, magic = TRAILER.unpack(self._read_at(size - TRAILER.size, TRAILER.size))
+        if magic != MAGIC or HEADER.size + footer_size + TRAILER.size > size:
+            raise ArquivoResultadosInvalidoException(f'{path} is truncated')
+
+        data_end = size - TRAILER.size - footer_size
+        footer = json.loads(self._read_at(data_end, footer_size).decode('utf-8'))
+        if [tuple(column) for column in footer['columns']] != list(COLUMNS):
+            raise ArquivoResultadosInvalidoException(f'{path} has unknown columns')
+
+        self._typecodes = dict(COLUMNS)
+        self._blocks = footer['blocks']
+        for block in self._blocks:
+            self._check_block(path, block, data_end)
+
+    def _check_block(self, path: str, block: Dict, data_end: int) -> None:
+        rows = block['rows']
+        if not isinstance(rows, int) or rows <= 0:
+            raise ArquivoResultadosInvalidoException(f'{path} has a block with {rows!r} rows')
+
+        for name, typecode in COLUMNS:
+            offset, size = block['columns'][name]
+            low, high = block['stats'][name]
+            if (
+                not isinstance(offset, int) or
+                not isinstance(size, int) or
+                not HEADER.size <= offset <= data_end - size or
+                size != rows * array(typecode).itemsize or
+                not isinstance(low, (int, float)) or
+                not isinstance(high, (int, float))
+            ):
+                raise ArquivoResultadosInvalidoException(f'{path} has a corrupted {name} column')
+
+    def __enter__(self) -> 'ResultsReader':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __len__(self) -> int:
+        return sum(block['rows'] for block in self._blocks)
+
+    def _read_at(self, offset: int, size: int) -> bytes:
+        self._file.seek(offset)
+        return self._file.read(size)
+
+    def _read_column(self, block: Dict, name: str) -> array:
+        offset, size = block['columns'][name]
+        values = array(self._typecodes[name])
+        values.frombytes(self._read_at(offset, size))
+        if sys.byteorder == 'big':
+            values.byteswap()
+        return values
+
+    def rows(
+        self,
+        year: Optional[int] = None,
+        bracket: Optional[int] = None,
+        rate_range: Optional[Tuple[float, float]] = None,
+    ) -> Iterator[ResultRow]:
+        ranges = {}
+        if year is not None:
+            ranges['year'] = (year, year)
+        if bracket is not None:
+            ranges['bracket'] = (bracket, bracket)
+        if rate_range is not None:
+            ranges['effective_rate'] = rate_range
+
+        for block in self._blocks:
+            if any(
+                block['stats'][name][1] < low or block['stats'][name][0] > high
+                for name, (low, high) in ranges.items()
+            ):
+                self.blocks_skipped += 1
+                continue
+
+            self.blocks_read += 1
+            filtered = {name: self._read_column(block, name) for name in ranges}
+            selected = [
+                index for index in range(block['rows'])
+                if all(low <= filtered[name][index] <= high for name, (low, high) in ranges.items())
+            ]
+            if not selected:
+                continue
+
+            columns = [
+                filtered[name] if name in filtered else self._read_column(block, name)
+                for name, _ in COLUMNS
+            ]
+            for index in selected:
+                yield ResultRow(*(column[index] for column in columns))
@@ -0,0 +1,70 @@
+import unittest
+from decimal import Decimal
+from parameterized import parameterized
+
+from irrf import IRRF, CalculateTax
+from differential import Taxpayer, boundary_taxpayers, reference_tax, run_differential
+
+
+def flat_tax(taxpayer: Taxpayer) -> float:
+    basis = float(
+        Decimal(str(taxpayer.income)) - (
+            Decimal(str(taxpayer.official_pension)) +
+            taxpayer.dependents * Decimal(str(IRRF.DEPENDENT_DEDUCTION)) +
+            Decimal(str(taxpayer.food_pension)) +
+            Decimal(str(taxpayer.other_deductions))
+        )
+    )
+    steps = [
+        (CalculateTax.THIRD_TAX_STEP, CalculateTax.FOURTH_ALIQUOT, CalculateTax.THIRD_RANGE_EXEMPT_VALUE),
+        (CalculateTax.SECOND_TAX_STEP, CalculateTax.THIRD_ALIQUOT, CalculateTax.SECOND_RANGE_EXEMPT_VALUE),
+        (CalculateTax.FIRST_TAX_STEP, CalculateTax.SECOND_ALIQUOT, CalculateTax.FIRST_RANGE_EXEMPT_VALUE),
+        (CalculateTax.TAX_EXEMPT_VALUE, CalculateTax.FIRST_ALIQUOT, CalculateTax.EXEMPT_VALUE),
+    ]
+    for limit, aliquot, exempt in steps:
+        if basis >= limit:
+            return round(basis * aliquot - exempt, 2)
+    return 0
+
+
+def mistyped_last_range_tax(taxpayer: Taxpayer) -> float:
+    # Wrong on purpose: the fourth range deduction is 869.36, not 869.63
+    tax = flat_tax(taxpayer)
+    if taxpayer.income >= CalculateTax.THIRD_TAX_STEP and taxpayer.dependents == 0 and not taxpayer.official_pension:
+        return round(tax - 0.27, 2)
+    return tax
+
+
+class DifferentialTestCase(unittest.TestCase):
+
+    @parameterized.expand([
+        [ Taxpayer(income=1000.00), 0.0 ],
+        [ Taxpayer(income=2500.00, dependents=1), 30.48 ],
+        [ Taxpayer(income=4500.00, food_pension=950.0), 177.70 ],
+        [ Taxpayer(income=5000.00, official_pension=500.0, dependents=2), 291.05 ],
+    ])
+    def test_reference_tax(self, taxpayer, expected_tax):
+        self.assertAlmostEqual(reference_tax(taxpayer), expected_tax, delta=0.01)
+
+    def test_boundary_taxpayers_walk_every_limit(self):
+        incomes = {taxpayer.income for taxpayer in boundary_taxpayers(spread=1) if taxpayer.dependents == 0 and not taxpayer.official_pension}
+        self.assertEqual(incomes, {1903.98, 1903.99, 1904.00, 2826.65, 2826.66, 2826.67, 3751.05, 3751.06, 3751.07, 4664.68, 4664.69, 4664.70})
+
+    @parameterized.expand([
+        [ 1 ],
+        [ 2 ],
+    ])
+    def test_equivalent_candidate_has_no_mismatches(self, workers):
+        report = run_differential(flat_tax, random_cases=5_000, boundary_spread=20, workers=workers, chunk_size=1_000)
+
+        self.assertTrue(report.ok, str(report))
+        self.assertEqual(report.checked, 5_000 + len(boundary_taxpayers(spread=20)))
+
+    def test_mismatches_on_bracket_limit_are_reported(self):
+        report = run_differential(mistyped_last_range_tax, random_cases=0, boundary_spread=2, workers=1, max_reported=2)
+
+        self.assertEqual(report.mismatch_count, 3)
+        self.assertEqual(len(report.mismatches), 2)
+        self.assertEqual(report.mismatches[0].taxpayer, Taxpayer(income=4664.69))
+        self.assertEqual(report.mismatches[0].expected, 413.43)
+        self.assertIn('mismatches=3', str(report))
@@ -0,0 +1,97 @@
+import unittest
+from unittest import mock
+from parameterized import parameterized
+
+import irrf as irrf_module
+from irrf import IRRF, BaseRange, CalculateTax
+from differential import Taxpayer, build_irrf, run_differential
+import kernel
+
+
+TABLE_2022 = [
+    BaseRange(min=0,       max=1903.98,      tax=0.0),
+    BaseRange(min=1903.99, max=2826.65,      tax=7.5),
+    BaseRange(min=2826.66, max=3751.05,      tax=15.0),
+    BaseRange(min=3751.06, max=4664.68,      tax=22.5),
+    BaseRange(min=4664.69, max=float('inf'), tax=27.5),
+]
+
+KERNEL_2022 = kernel.compile_kernel_from_base_range(TABLE_2022)
+
+
+def kernel_tax(taxpayer: Taxpayer) -> float:
+    return kernel.tax(build_irrf(taxpayer).calculation_basis)
+
+
+def table_kernel_tax(taxpayer: Taxpayer) -> float:
+    return KERNEL_2022.tax(build_irrf(taxpayer).calculation_basis)
+
+
+class KernelTestCase(unittest.TestCase):
+
+    @parameterized.expand([
+        [ 1903.98, 0 ],
+        [ 1903.99, 1 ],
+        [ 2826.66, 2 ],
+        [ 3751.05, 2 ],
+        [ 4664.69, 4 ],
+        [ 90000.0, 4 ],
+    ])
+    def test_bracket(self, basis, expected_bracket):
+        self.assertEqual(kernel.bracket(basis), expected_bracket)
+
+    @parameterized.expand([
+        [ 1000.00 ],
+        [ 2310.41 ],
+        [ 3500.00 ],
+        [ 4664.68 ],
+        [ 9000.00 ],
+    ])
+    def test_matches_irrf(self, income):
+        irrf = IRRF()
+        irrf.register_income(income, 'Weekly salary')
+
+        self.assertEqual(kernel.tax(irrf.calculation_basis), irrf.get_tax())
+        self.assertEqual(kernel.effective_rate(irrf.total_income, irrf.calculation_basis), irrf.effective_rate)
+
+    def test_irrf_selects_kernel(self):
+        self.assertIs(irrf_module.kernel, kernel)
+
+    @parameterized.expand([
+        [ 2310.41 ],
+        [ 9000.00 ],
+    ])
+    def test_irrf_falls_back_to_calculate_tax(self, income):
+        irrf = IRRF()
+        irrf.register_income(income, 'Weekly salary')
+        expected = (irrf.get_tax(), irrf.effective_rate)
+
+        with mock.patch.object(irrf_module, 'kernel', None):
+            self.assertEqual((irrf.get_tax(), irrf.effective_rate), expected)
+
+    def test_array_functions(self):
+        bases = [1000.00, 3000.00, 9000.00]
+
+        self.assertEqual(kernel.brackets(bases), [0, 2, 4])
+        self.assertEqual(kernel.taxes(bases), [kernel.tax(basis) for basis in bases])
+        self.assertEqual(kernel.effective_rates(bases, bases), [kernel.effective_rate(basis, basis) for basis in bases])
+
+    def test_table_kernel_exempt_values(self):
+        self.assertEqual(KERNEL_2022.tax(9000.00), kernel.tax(9000.00))
+
+    @parameterized.expand([
+        [ [1903.99], [CalculateTax.FIRST_ALIQUOT], [] ],
+        [ [], [], [] ],
+    ])
+    def test_invalid_table(self, limits, aliquots, exempt_values):
+        with self.assertRaises(ValueError):
+            kernel.compile_kernel(limits, aliquots, exempt_values)
+
+    @parameterized.expand([
+        [ kernel_tax ],
+        [ table_kernel_tax ],
+    ])
+    def test_differential(self, candidate):
+        report = run_differential(candidate, random_cases=20_000, boundary_spread=100, workers=1)
+
+        self.assertTrue(report.ok, str(report))
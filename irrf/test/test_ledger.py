@@ -0,0 +1,163 @@
+import unittest
+from parameterized import parameterized
+
+from irrf import IRRF, Deduction
+from differential import Taxpayer, run_differential
+from ledger import IRRFLedger
+from registry import DeductionRegistry
+from exceptions import DeducaoDuplicadaException, EstornoInvalidoException, ValorRendimentoInvalidoException
+
+
+def corrected_ledger_tax(taxpayer: Taxpayer) -> float:
+    # Registers the taxpayer with a wrong income, a duplicated dependent and
+    # a wrong deduction, then reverses them in between the real registrations
+    ledger = IRRFLedger(snapshot_interval=3)
+    wrong_income = ledger.register_income(taxpayer.income + 1000.01, 'Rendimento')
+    ledger.register_income(taxpayer.income, 'Rendimento')
+    wrong_deduction = ledger.register_other_deductions(('Outras deducoes', 33.33))
+    if taxpayer.official_pension:
+        ledger.register_official_pension(('Previdencia oficial', taxpayer.official_pension))
+    ledger.reverse(wrong_income)
+    for index in range(taxpayer.dependents):
+        ledger.register_dependent(f'Dependente {index}')
+    duplicated = ledger.register_dependent('Dependente duplicado')
+    if taxpayer.food_pension:
+        ledger.register_food_pension(taxpayer.food_pension)
+    ledger.reverse(wrong_deduction)
+    ledger.reverse(duplicated)
+    if taxpayer.other_deductions:
+        ledger.register_other_deductions(('Outras deducoes', taxpayer.other_deductions))
+    return ledger.state.get_tax()
+
+
+class IRRFLedgerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.ledger = IRRFLedger(snapshot_interval=2)
+
+    def test_totals_match_irrf(self):
+        irrf = IRRF()
+        irrf.register_income(5000.00, 'Weekly salary')
+        irrf.register_official_pension(("Carne INSS", 500.0))
+        irrf.register_dependent("Pedro")
+        irrf.register_dependent("Joao")
+
+        self.ledger.register_income(5000.00, 'Weekly salary')
+        self.ledger.register_official_pension(("Carne INSS", 500.0))
+        self.ledger.register_dependent("Pedro")
+        self.ledger.register_dependent("Joao")
+
+        self.assertAlmostEqual(self.ledger.state.calculation_basis, irrf.calculation_basis)
+        self.assertEqual(self.ledger.state.get_tax(), irrf.get_tax())
+        self.assertEqual(self.ledger.state.effective_rate, irrf.effective_rate)
+
+    def test_differential(self):
+        report = run_differential(corrected_ledger_tax, random_cases=20_000, boundary_spread=100, workers=1)
+
+        self.assertTrue(report.ok, str(report))
+
+    def test_reversal_matches_rebuilt_irrf(self):
+        irrf = IRRF()
+        irrf.register_income(3011.39, 'Weekly salary')
+        irrf.register_dependent("Joao")
+
+        wrong = self.ledger.register_income(0.1, 'Weekly salary')
+        self.ledger.register_income(3011.39, 'Weekly salary')
+        self.ledger.register_dependent("Joao")
+        self.ledger.reverse(wrong)
+
+        self.assertEqual(self.ledger.state.calculation_basis, irrf.calculation_basis)
+        self.assertEqual(self.ledger.state.get_tax(), irrf.get_tax())
+
+    def test_keeps_sub_centavo_values(self):
+        self.ledger.register_income(100.004, 'Weekly salary')
+
+        self.assertEqual(self.ledger.state.total_income, 100.004)
+
+    def test_reverse_duplicated_income(self):
+        self.ledger.register_income(3000.00, 'Weekly salary')
+        duplicated = self.ledger.register_income(3000.00, 'Weekly salary')
+        self.ledger.register_food_pension(400.0)
+
+        reversal = self.ledger.reverse(duplicated)
+
+        self.assertEqual(self.ledger.state.total_income, 3000.00)
+        self.assertEqual(self.ledger.state.calculation_basis, 2600.00)
+        self.assertEqual(self.ledger.events[reversal].reverses, duplicated)
+        self.assertEqual(len(self.ledger), 4)
+
+    def test_correct_pension_value(self):
+        wrong = self.ledger.register_official_pension(("Carne INSS", 5000.0))
+        self.ledger.reverse(wrong)
+        self.ledger.register_official_pension(("Carne INSS", 500.0))
+
+        self.assertEqual(self.ledger.state.get_total_official_pension(), 500.0)
+
+    @parameterized.expand([
+        [ 0, 0.0, 0.0 ],
+        [ 1, 1000.10, 0.0 ],
+        [ 2, 1000.10, 0.30 ],
+        [ 3, 1000.10, 0.50 ],
+        [ 4, 1000.10, 0.20 ],
+        [ 5, 1000.10, 0.0 ],
+    ])
+    def test_state_at(self, sequence, expected_income, expected_other_deductions):
+        self.ledger.register_income(1000.10, 'Weekly salary')
+        first = self.ledger.register_other_deductions(("Funpresp", 0.30))
+        second = self.ledger.register_other_deductions(("Funpresp", 0.20))
+        self.ledger.reverse(first)
+        self.ledger.reverse(second)
+
+        state = self.ledger.state_at(sequence)
+
+        self.assertEqual(state.total_income, expected_income)
+        self.assertEqual(state.get_other_deductions(), expected_other_deductions)
+
+    def test_state_at_out_of_range(self):
+        with self.assertRaises(IndexError):
+            self.ledger.state_at(1)
+
+    def test_invalid_registration_is_not_logged(self):
+        with self.assertRaises(ValorRendimentoInvalidoException):
+            self.ledger.register_income(-100.0, 'Weekly salary')
+
+        self.assertEqual(len(self.ledger), 0)
+
+    def test_invalid_reversals(self):
+        income = self.ledger.register_income(1000.0, 'Weekly salary')
+        reversal = self.ledger.reverse(income)
+
+        for sequence in [income, reversal, 10]:
+            with self.assertRaises(EstornoInvalidoException):
+                self.ledger.reverse(sequence)
+
+    @parameterized.expand([
+        [ DeductionRegistry.KEEP_ALL, 189.59 * 3 ],
+        [ DeductionRegistry.KEEP_FIRST, 189.59 * 2 ],
+    ])
+    def test_duplicate_policy(self, policy, expected_deduction):
+        ledger = IRRFLedger(duplicate_policy=policy)
+        for name in ["Maria", "Joao", "Maria"]:
+            ledger.register_dependent(name)
+
+        self.assertAlmostEqual(ledger.state.get_total_dependent_deductions(), expected_deduction)
+
+    def test_discarded_duplicate_is_not_logged(self):
+        ledger = IRRFLedger(duplicate_policy=DeductionRegistry.KEEP_FIRST)
+        ledger.register_dependent("Maria")
+
+        self.assertIsNone(ledger.register_dependent("Maria"))
+        self.assertEqual(len(ledger), 1)
+
+    def test_reversed_dependent_can_be_registered_again(self):
+        ledger = IRRFLedger(duplicate_policy=DeductionRegistry.RAISE)
+        maria = ledger.register_dependent("Maria")
+
+        with self.assertRaises(DeducaoDuplicadaException):
+            ledger.register_dependent("Maria")
+
+        ledger.reverse(maria)
+        ledger.register_dependent("Maria")
+
+        self.assertEqual(ledger.state.get_total_dependent_deductions(), 189.59)
+        self.assertEqual(ledger.deduction_registry.count(Deduction('Dependente', 'Dependente', 189.59, name='Maria')), 1)
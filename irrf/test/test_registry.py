@@ -0,0 +1,92 @@
+import unittest
+from parameterized import parameterized
+
+from irrf import IRRF, Deduction
+from registry import DeductionRegistry, deduplicate
+from exceptions import DeducaoDuplicadaException
+
+
+class DeductionRegistryTestCase(unittest.TestCase):
+
+    @parameterized.expand([
+        [ Deduction('Dependente', 'Dependente', 189.59, name='Maria'), ('Dependente', 'Maria') ],
+        [ Deduction('Pensão alimenticia', 'Pensao alimenticia', 400.0), ('Pensão alimenticia', 'Pensao alimenticia', 400.0) ],
+        [ Deduction('Outras deducoes', 'Funpresp', 50.0), ('Outras deducoes', 'Funpresp', 50.0) ],
+    ])
+    def test_key(self, deduction, expected_key):
+        self.assertEqual(DeductionRegistry.key(deduction), expected_key)
+
+    def test_duplicate_detection(self):
+        registry = DeductionRegistry()
+        maria = Deduction('Dependente', 'Dependente', 189.59, name='Maria')
+
+        self.assertNotIn(maria, registry)
+        registry.add(maria)
+        registry.add(Deduction('Dependente', 'Dependente', 189.59, name='Maria'))
+        registry.add(Deduction('Dependente', 'Dependente', 189.59, name='Joao'))
+
+        self.assertIn(maria, registry)
+        self.assertEqual(registry.count(maria), 2)
+        self.assertEqual(registry.duplicates(), [('Dependente', 'Maria')])
+
+    def test_discard(self):
+        registry = DeductionRegistry()
+        maria = Deduction('Dependente', 'Dependente', 189.59, name='Maria')
+        registry.add(maria)
+        registry.add(maria)
+
+        registry.discard(maria)
+        self.assertEqual(registry.count(maria), 1)
+
+        registry.discard(maria)
+        self.assertNotIn(maria, registry)
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            DeductionRegistry('keep_last')
+
+    def test_deduplicate_merged_ledger(self):
+        ledger = [
+            Deduction('Dependente', 'Dependente', 189.59, name='Maria'),
+            Deduction('Outras deducoes', 'Funpresp', 50.0),
+            Deduction('Dependente', 'Dependente', 189.59, name='Maria'),
+            Deduction('Outras deducoes', 'Funpresp', 80.0),
+            Deduction('Outras deducoes', 'Funpresp', 50.0),
+        ]
+
+        unique = deduplicate(ledger)
+
+        self.assertEqual([deduction.value for deduction in unique], [189.59, 50.0, 80.0])
+
+
+class IRRFDuplicatePolicyTestCase(unittest.TestCase):
+
+    @parameterized.expand([
+        [ DeductionRegistry.KEEP_ALL, 189.59 * 3 ],
+        [ DeductionRegistry.KEEP_FIRST, 189.59 * 2 ],
+    ])
+    def test_register_duplicated_dependent(self, policy, expected_deduction):
+        irrf = IRRF(duplicate_policy=policy)
+        irrf.register_deduction(("Dependende", (["Maria", "Joao", "Maria"])))
+
+        self.assertAlmostEqual(irrf.get_total_dependent_deductions(), expected_deduction)
+
+    def test_keep_first_ignores_repeated_other_deductions(self):
+        irrf = IRRF(duplicate_policy=DeductionRegistry.KEEP_FIRST)
+        irrf.register_official_pension(("Carne INSS", 500.0))
+        irrf.register_official_pension(("Carne INSS", 500.0))
+        irrf.register_food_pension(400.0)
+        irrf.register_food_pension(400.0)
+        irrf.register_other_deductions(("Funpresp", 50.0))
+        irrf.register_other_deductions(("Funpresp", 60.0))
+
+        self.assertEqual(irrf.all_deductions, 1010.0)
+
+    def test_raise_on_duplicated_dependent(self):
+        irrf = IRRF(duplicate_policy=DeductionRegistry.RAISE)
+        irrf.register_dependent("Maria")
+
+        with self.assertRaises(DeducaoDuplicadaException):
+            irrf.register_dependent("Maria")
+
+        self.assertEqual(irrf.get_total_dependent_deductions(), 189.59)
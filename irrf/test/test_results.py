@@ -0,0 +1,155 @@
+import json
+import os
+import struct
+import tempfile
+import unittest
+from parameterized import parameterized
+
+from irrf import IRRF
+from results import ResultRow, ResultsReader, ResultsWriter
+from exceptions import ArquivoResultadosInvalidoException
+
+
+def make_irrf(income: float, dependents=()) -> IRRF:
+    irrf = IRRF()
+    irrf.register_income(income, 'Weekly salary')
+    for name in dependents:
+        irrf.register_dependent(name)
+    return irrf
+
+
+class ResultsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'results.irrf')
+
+        # Block 0 holds 2021 exempt taxpayers, block 1 2022 taxpayers in
+        # the second range and block 2 2022 taxpayers in the last range
+        self.rows = []
+        for taxpayer_id in range(3):
+            self.rows.append(ResultRow.from_irrf(taxpayer_id, 2021, make_irrf(1000.0 + taxpayer_id)))
+        for taxpayer_id in range(3, 6):
+            self.rows.append(ResultRow.from_irrf(taxpayer_id, 2022, make_irrf(3500.0 + taxpayer_id, ['Maria'])))
+        for taxpayer_id in range(6, 9):
+            self.rows.append(ResultRow.from_irrf(taxpayer_id, 2022, make_irrf(9000.0 * taxpayer_id)))
+
+        with ResultsWriter(self.path, block_size=3) as writer:
+            for row in self.rows:
+                writer.write(row)
+
+    def test_from_irrf(self):
+        row = ResultRow.from_irrf(42, 2022, make_irrf(2500.0, ['Joao']))
+
+        self.assertEqual(row.dependent_deductions, 189.59)
+        self.assertEqual(row.tax, 30.48)
+        self.assertEqual(row.bracket, 1)
+
+    def test_round_trip(self):
+        with ResultsReader(self.path) as reader:
+            self.assertEqual(len(reader), 9)
+            self.assertEqual(list(reader.rows()), self.rows)
+
+    @parameterized.expand([
+        [ {'year': 2021}, [0, 1, 2], 2 ],
+        [ {'year': 2022, 'bracket': 4}, [6, 7, 8], 2 ],
+        [ {'bracket': 2}, [3, 4, 5], 2 ],
+        [ {'rate_range': (20.0, 30.0)}, [6, 7, 8], 2 ],
+        [ {'year': 2020}, [], 3 ],
+    ])
+    def test_filters_skip_blocks(self, filters, expected_ids, expected_skipped):
+        with ResultsReader(self.path) as reader:
+            ids = [row.taxpayer_id for row in reader.rows(**filters)]
+
+            self.assertEqual(ids, expected_ids)
+            self.assertEqual(reader.blocks_skipped, expected_skipped)
+
+    def test_rejects_other_files(self):
+        with open(self.path, 'wb') as output:
+            output.write(b'taxpayer_id,year\n')
+
+        with self.assertRaises(ArquivoResultadosInvalidoException):
+            ResultsReader(self.path)
+
+    @parameterized.expand([
+        [ b'\x02\x00' ],
+        [ b'\x00\x00' ],
+    ])
+    def test_rejects_unsupported_versions(self, version):
+        with open(self.path, 'r+b') as output:
+            output.seek(7)
+            output.write(version)
+
+        with self.assertRaises(ArquivoResultadosInvalidoException):
+            ResultsReader(self.path)
+
+    def test_rejects_header_only_file(self):
+        with open(self.path, 'wb') as output:
+            output.write(b'IRRFCOL\x01\x00')
+
+        with self.assertRaises(ArquivoResultadosInvalidoException):
+            ResultsReader(self.path)
+
+    def test_rejects_footer_bigger_than_file(self):
+        with open(self.path, 'r+b') as output:
+            output.seek(-11, 2)
+            output.write(b'\xff\xff\xff\x00')
+
+        with self.assertRaises(ArquivoResultadosInvalidoException):
+            ResultsReader(self.path)
+
+    def test_rejects_corrupt_footer(self):
+        with open(self.path, 'r+b') as output:
+            output.seek(-12, 2)
+            output.write(b'#')
+
+        with self.assertRaises(ArquivoResultadosInvalidoException):
+            ResultsReader(self.path)
+
+    def _rewrite_footer(self, change):
+        with open(self.path, 'rb') as source:
+            data = source.read()
+        footer_size = struct.unpack('<I', data[-11:-7])[0]
+        footer = json.loads(data[-11 - footer_size:-11])
+        change(footer)
+        encoded = json.dumps(footer).encode('utf-8')
+        with open(self.path, 'wb') as output:
+            output.write(data[:-11 - footer_size] + encoded + struct.pack('<I7s', len(encoded), b'IRRFCOL'))
+
+    @parameterized.expand([
+        [ lambda footer: footer['blocks'][0]['columns']['tax'].__setitem__(1, 7) ],
+        [ lambda footer: footer['blocks'][1]['columns']['year'].__setitem__(0, 10 ** 9) ],
+        [ lambda footer: footer['blocks'][2].pop('stats') ],
+        [ lambda footer: footer['blocks'][0]['columns'].pop('bracket') ],
+        [ lambda footer: footer['blocks'][0].__setitem__('rows', 'three') ],
+        [ lambda footer: footer['columns'].pop() ],
+    ])
+    def test_rejects_corrupt_blocks(self, change):
+        self._rewrite_footer(change)
+
+        with self.assertRaises(ArquivoResultadosInvalidoException):
+            ResultsReader(self.path)
+
+    @parameterized.expand([
+        [ 'emp-1', 2022 ],
+        [ 1, 2022.5 ],
+        [ 2 ** 63, 2022 ],
+    ])
+    def test_write_rejects_rows_outside_column_types(self, taxpayer_id, year):
+        with ResultsWriter(self.path) as writer:
+            with self.assertRaises(ValueError):
+                writer.write_irrf(taxpayer_id, year, make_irrf(1000.0))
+            writer.write(self.rows[0])
+
+        with ResultsReader(self.path) as reader:
+            self.assertEqual(list(reader.rows()), [self.rows[0]])
+
+    def test_failed_write_leaves_file_unfinished(self):
+        with self.assertRaises(RuntimeError):
+            with ResultsWriter(self.path, block_size=1) as writer:
+                writer.write(self.rows[0])
+                raise RuntimeError('feed interrupted')
+
+        with self.assertRaises(ArquivoResultadosInvalidoException):
+            ResultsReader(self.path)
@@ -0,0 +1,81 @@
+import unittest
+from parameterized import parameterized
+
+from irrf import IRRF
+from withholding import CompanyWithholding, MonthlyWithholding, Payment
+from exceptions import ValorRendimentoInvalidoException
+
+
+class MonthlyWithholdingTestCase(unittest.TestCase):
+
+    @parameterized.expand([
+        [ [ (1000.00, 'Salary') ], [ 0.0 ] ],
+        [ [ (3000.00, 'Salary'), (500.00, 'Bonus') ], [ 95.20, 75.00 ] ],
+        [ [ (1500.00, 'Salary'), (1000.00, 'Bonus'), (6500.00, 'Vacation') ], [ 0.0, 44.70, 1560.94 ] ],
+    ])
+    def test_pay(self, payments, expected_withholdings):
+        tracker = MonthlyWithholding()
+
+        withholdings = [tracker.pay(value, description) for value, description in payments]
+
+        self.assertEqual(withholdings, expected_withholdings)
+        self.assertAlmostEqual(tracker.withheld, tracker.irrf.get_tax(), delta=0.001)
+
+    def test_pay_with_dependents(self):
+        irrf = IRRF()
+        irrf.register_dependent('Joao')
+        tracker = MonthlyWithholding(irrf)
+
+        self.assertEqual(tracker.pay(2500.00, 'Salary'), 30.48)
+
+    def test_deduction_after_payment_is_not_refunded(self):
+        tracker = MonthlyWithholding()
+        tracker.pay(3000.00, 'Salary')
+        tracker.irrf.register_food_pension(1000.0)
+
+        self.assertEqual(tracker.pay(100.00, 'Bonus'), 0.0)
+        self.assertEqual(tracker.withheld, 95.20)
+
+
+    def test_invalid_payment_leaves_tracker_unchanged(self):
+        tracker = MonthlyWithholding()
+        tracker.pay(3000.00, 'Salary')
+
+        with self.assertRaises(ValorRendimentoInvalidoException):
+            tracker.pay(-2000.00, 'Bad')
+
+        self.assertEqual(tracker.irrf.total_income, 3000.00)
+        self.assertEqual(tracker.pay(500.00, 'Bonus'), 75.00)
+
+
+class CompanyWithholdingTestCase(unittest.TestCase):
+
+    def test_process(self):
+        company = CompanyWithholding()
+        company.tracker('ana', '2022-01').irrf.register_dependent('Pedro')
+
+        withholdings = company.process([
+            Payment('ana', '2022-01', 2500.00, 'Salary'),
+            Payment('bia', '2022-01', 3000.00, 'Salary'),
+            Payment('bia', '2022-01', 500.00, 'Bonus'),
+            Payment('bia', '2022-02', 500.00, 'Bonus'),
+        ])
+
+        self.assertEqual(withholdings, [30.48, 95.20, 75.00, 0.0])
+        self.assertEqual(company.withheld('bia', '2022-01'), 170.20)
+        self.assertEqual(company.withheld('bia', '2022-03'), 0.0)
+
+    def test_invalid_payment_rejects_whole_stream(self):
+        company = CompanyWithholding()
+
+        with self.assertRaises(ValorRendimentoInvalidoException):
+            company.process([
+                Payment('a', 'm', 3000.00, 'Salary'),
+                Payment('a', 'm', -2000.00, 'Bad'),
+            ])
+
+        self.assertEqual(company.withheld('a', 'm'), 0.0)
+        self.assertEqual(company.process([
+            Payment('a', 'm', 3000.00, 'Salary'),
+            Payment('a', 'm', 500.00, 'Bonus'),
+        ]), [95.20, 75.00])
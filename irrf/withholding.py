@@ -0,0 +1,67 @@
+from typing import Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+
+from irrf import IRRF, Income
+
+
+class Payment(NamedTuple):
+    employee_id: Hashable
+    month: str
+    value: float
+    description: str
+
+
+class MonthlyWithholding:
+    """
+    Progressive withholding of one employee in one month. Each payment is
+    added to the IRRF, the tax is computed on the accumulated calculation
+    basis and only the part not withheld by previous payments is due.
+    """
+
+    def __init__(self, irrf: Optional[IRRF] = None) -> None:
+        self.irrf = irrf if irrf is not None else IRRF()
+        self.withheld = 0.0
+
+    def pay(self, value: float, description: str) -> float:
+        self.irrf.register_income(value, description)
+
+        due = self.irrf.get_tax()
+        withholding = max(round(due - self.withheld, 2), 0.0)
+        self.withheld = round(self.withheld + withholding, 2)
+        return withholding
+
+
+class CompanyWithholding:
+    """
+    Keeps one `MonthlyWithholding` per (employee, month). Deductions such as
+    dependents are registered on `tracker(...).irrf` before the payments.
+    """
+
+    def __init__(self) -> None:
+        self._trackers: Dict[Tuple[Hashable, str], MonthlyWithholding] = {}
+
+    def tracker(self, employee_id: Hashable, month: str) -> MonthlyWithholding:
+        key = (employee_id, month)
+        tracker = self._trackers.get(key)
+        if tracker is None:
+            tracker = self._trackers[key] = MonthlyWithholding()
+        return tracker
+
+    def process(self, payments: Iterable[Payment]) -> List[float]:
+        """
+        Withholds every payment of the stream in order and returns the
+        amount withheld from each one. The whole stream is validated first,
+        so an invalid payment raises before any payment is applied.
+        """
+        payments = list(payments)
+        for payment in payments:
+            Income(value=payment.value, description=payment.description)
+
+        withholdings = []
+        for payment in payments:
+            tracker = self.tracker(payment.employee_id, payment.month)
+            withholdings.append(tracker.pay(payment.value, payment.description))
+        return withholdings
+
+    def withheld(self, employee_id: Hashable, month: str) -> float:
+        tracker = self._trackers.get((employee_id, month))
+        return tracker.withheld if tracker is not None else 0.0